@@ -3,15 +3,26 @@ import base64
 import json
 import logging
 import io
+import hashlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 from PIL import Image
 import os
 import dotenv
 dotenv.load_dotenv()
+from partial_json import PartialJSONObjectParser
+from semantic_cache import SemanticAnswerCache
 from config import (
     OPENAI_MODEL, 
     OPENAI_TEMPERATURE, 
     SUPPORTED_IMAGE_FORMATS,
+    THUMBNAIL_MAX_SIZE,
+    THUMBNAIL_FORMAT,
+    THUMBNAIL_QUALITY,
+    THUMBNAIL_CACHE_MAX_ENTRIES,
     APP_TITLE,
     APP_ICON,
     APP_LAYOUT,
@@ -23,8 +34,21 @@ from config import (
     FOOD_RECOMMENDATION_SYSTEM_PROMPT,
     FOOD_ANALYSIS_ENHANCED_PROMPT,
     ANALYSIS_MODEL,
+    ENABLE_STREAMING_ANALYSIS,
     CHAT_MODEL,
-    RECOMMENDATION_MODEL
+    RECOMMENDATION_MODEL,
+    AI_CONNECTION_ERROR_MESSAGE,
+    CHATBOT_ERROR_MESSAGE,
+    RECOMMENDATION_ERROR_MESSAGE,
+    QUICK_ACTION_PROMPTS,
+    ENABLE_PREFETCH,
+    PREFETCH_MAX_CALLS_PER_HOUR,
+    PREFETCH_MAX_WORKERS,
+    QUICK_ACTION_REFRESH_SECONDS,
+    ENABLE_SEMANTIC_CACHE,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_DIMENSIONS
 )
 
 logging.basicConfig(level=logging.INFO)
@@ -48,6 +72,41 @@ def get_openai_client():
         st.error(f"Error initializing OpenAI client: {e}")
         return None
 
+@st.cache_data(show_spinner=False, max_entries=THUMBNAIL_CACHE_MAX_ENTRIES)
+def _build_image_thumbnail(image_hash, _img_bytes):
+    """
+    Build a downscaled preview of an uploaded image.
+    Cached by content hash so each image is only resized once.
+    """
+    img = Image.open(io.BytesIO(_img_bytes))
+    img.thumbnail(THUMBNAIL_MAX_SIZE)
+    # Keep transparency for WebP; palette/LA images are normalized to RGBA
+    has_alpha = img.mode in ('RGBA', 'LA') or 'transparency' in img.info
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+    
+    buffer = io.BytesIO()
+    try:
+        img.save(buffer, format=THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+    except (KeyError, OSError):
+        # Pillow built without WebP support; JPEG has no alpha channel
+        buffer = io.BytesIO()
+        img.convert('RGB').save(buffer, format='JPEG', quality=THUMBNAIL_QUALITY)
+    return buffer.getvalue()
+
+def get_image_hash(img_bytes):
+    """Content hash identifying an uploaded image."""
+    return hashlib.sha256(img_bytes).hexdigest()
+
+def get_image_thumbnail(img_bytes, image_hash=None):
+    """
+    Return preview thumbnail bytes for an uploaded image.
+    Only the thumbnail is sent to the browser; the full image stays server-side.
+    """
+    if image_hash is None:
+        image_hash = get_image_hash(img_bytes)
+    return _build_image_thumbnail(image_hash, img_bytes)
+
 system_prompt = """You are a Food Nutrition Analyzer AI. You will receive a food image and your task is to identify the dish and provide its estimated nutritional information in JSON format.
 
 Rules:
@@ -141,14 +200,53 @@ def analyze_food_image(file_obj):
 
         return DEFAULT_UNKNOWN_NUTRITION
 
+@st.cache_resource
+def get_semantic_cache():
+    """Get the chatbot answer cache shared by all sessions."""
+    return SemanticAnswerCache(
+        dimensions=SEMANTIC_CACHE_DIMENSIONS,
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+        max_entries=SEMANTIC_CACHE_MAX_ENTRIES
+    )
+
+def get_food_context(analysis_result):
+    """Name of the analyzed food the chat can refer to, or "" if there is none."""
+    if analysis_result and analysis_result.get("food_name") not in ["Not Food", "Unknown"]:
+        return analysis_result["food_name"]
+    return ""
+
+def is_opening_question(user_message, chat_history=None):
+    """
+    True if the message is the first user turn of the conversation.
+    chat_history may already end with the message itself.
+    """
+    earlier_turns = list(chat_history or [])
+    if earlier_turns and earlier_turns[-1] == {"role": "user", "content": user_message}:
+        earlier_turns = earlier_turns[:-1]
+    return not any(message["role"] == "user" for message in earlier_turns)
+
 def get_chatbot_response(user_message, chat_history=None, analysis_result=None):
     """
     Generate a chatbot response using OpenAI's API.
+    Opening questions (no earlier user turns) that closely match an earlier
+    opening question about the same food are served from the semantic cache
+    when it is enabled.
     """
+    food_context = get_food_context(analysis_result)
+    
+    # Follow-ups depend on the conversation so far, and the cache is shared
+    # across sessions, so only cache the first user turn of a conversation
+    cacheable = ENABLE_SEMANTIC_CACHE and is_opening_question(user_message, chat_history)
+    cache = get_semantic_cache() if cacheable else None
+    if cache:
+        cached_answer = cache.get(user_message, food_context)
+        if cached_answer is not None:
+            return cached_answer
+    
     try:
         client = get_openai_client()
         if not client:
-            return "I'm sorry, I'm having trouble connecting to the AI service. Please try again later."
+            return AI_CONNECTION_ERROR_MESSAGE
         
         
         messages = [{"role": "system", "content": CHATBOT_SYSTEM_PROMPT}]
@@ -174,11 +272,14 @@ def get_chatbot_response(user_message, chat_history=None, analysis_result=None):
             max_tokens=CHATBOT_MAX_TOKENS
         )
         
-        return response.choices[0].message.content.strip()
+        answer = response.choices[0].message.content.strip()
+        if cache:
+            cache.add(user_message, food_context, answer)
+        return answer
         
     except Exception as e:
         logger.error(f"Error in get_chatbot_response: {e}")
-        return "I'm sorry, I encountered an error while processing your message. Please try again."
+        return CHATBOT_ERROR_MESSAGE
 
 def render_chatbot_interface():
     """
@@ -192,20 +293,23 @@ def render_chatbot_interface():
     
     with col1:
         if st.button("🍎 Ask About Fruits", use_container_width=True):
-            st.session_state.quick_question = "Tell me about the health benefits of different fruits and which ones I should include in my diet."
+            st.session_state.quick_question = QUICK_ACTION_PROMPTS["fruits"]
     
     with col2:
         if st.button("💪 Protein Sources", use_container_width=True):
-            st.session_state.quick_question = "What are the best protein sources for a healthy diet and how much protein should I eat daily?"
+            st.session_state.quick_question = QUICK_ACTION_PROMPTS["protein"]
     
     with col3:
         if st.button("🥗 Meal Planning", use_container_width=True):
-            st.session_state.quick_question = "Help me create a balanced meal plan for the week with healthy breakfast, lunch, and dinner options."
+            st.session_state.quick_question = QUICK_ACTION_PROMPTS["meal_planning"]
     
     
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
     
+    if ENABLE_PREFETCH:
+        get_prefetcher().refresh_quick_answers(QUICK_ACTION_PROMPTS.values())
+    
     
     chat_container = st.container()
     with chat_container:
@@ -234,9 +338,16 @@ def render_chatbot_interface():
         
         
         with st.chat_message("assistant"):
-            with st.spinner("🧠 AI Nutritionist is thinking..."):
-                response = get_chatbot_response(prompt, st.session_state.chat_history, analysis_result)
-                st.write(response)
+            # Prefetched answers are generic, so only use them when the session has
+            # no analyzed food and no earlier conversation they would ignore
+            response = None
+            if (ENABLE_PREFETCH and not get_food_context(analysis_result)
+                    and is_opening_question(prompt, st.session_state.chat_history)):
+                response = get_prefetcher().get_quick_answer(prompt)
+            if response is None:
+                with st.spinner("🧠 AI Nutritionist is thinking..."):
+                    response = get_chatbot_response(prompt, st.session_state.chat_history, analysis_result)
+            st.write(response)
         
         
         st.session_state.chat_history.append({"role": "assistant", "content": response})
@@ -282,7 +393,7 @@ def render_chatbot_interface():
     
     with col3:
         if st.button("💡 Get Tips", use_container_width=True):
-            st.session_state.quick_question = "Give me 5 practical nutrition tips for improving my daily diet and overall health."
+            st.session_state.quick_question = QUICK_ACTION_PROMPTS["tips"]
     
     if hasattr(st.session_state, 'enhanced_analysis_result'):
         result = st.session_state.enhanced_analysis_result
@@ -314,9 +425,150 @@ def main():
     with tab4:
         render_health_insights_interface()
 
-def analyze_food_image_enhanced(file_obj):
+AI_ERROR_MESSAGES = {AI_CONNECTION_ERROR_MESSAGE, CHATBOT_ERROR_MESSAGE, RECOMMENDATION_ERROR_MESSAGE}
+
+class Prefetcher:
+    """
+    Runs speculative LLM calls in the background, shared across sessions.
+    Every call counts against a rolling hourly budget so prefetching can't run away.
+    """
+
+    def __init__(self, max_calls_per_hour, refresh_seconds):
+        self.max_calls_per_hour = max_calls_per_hour
+        self.refresh_seconds = refresh_seconds
+        self._executor = ThreadPoolExecutor(max_workers=PREFETCH_MAX_WORKERS, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._call_times = deque()
+        self._quick_answers = {}  # prompt -> (answer, generated_at)
+        self._pending_prompts = set()
+
+    def _reserve_call(self):
+        now = time.time()
+        with self._lock:
+            while self._call_times and now - self._call_times[0] > 3600:
+                self._call_times.popleft()
+            if len(self._call_times) >= self.max_calls_per_hour:
+                return False
+            self._call_times.append(now)
+            return True
+
+    def submit(self, fn, *args):
+        """
+        Schedule fn(*args) in the background. Returns a Future, or None if the
+        hourly budget is exhausted.
+        """
+        if not self._reserve_call():
+            logger.info("Prefetch budget exhausted, skipping speculative call")
+            return None
+        return self._executor.submit(fn, *args)
+
+    def get_quick_answer(self, prompt):
+        """Return the pre-generated answer for a quick action prompt, if any."""
+        with self._lock:
+            entry = self._quick_answers.get(prompt)
+        return entry[0] if entry else None
+
+    def refresh_quick_answers(self, prompts):
+        """Regenerate any quick action answers that are missing or older than refresh_seconds."""
+        now = time.time()
+        for prompt in prompts:
+            with self._lock:
+                entry = self._quick_answers.get(prompt)
+                if prompt in self._pending_prompts or (entry and now - entry[1] < self.refresh_seconds):
+                    continue
+                self._pending_prompts.add(prompt)
+            
+            if self.submit(self._generate_quick_answer, prompt) is None:
+                with self._lock:
+                    self._pending_prompts.discard(prompt)
+                break
+
+    def _generate_quick_answer(self, prompt):
+        try:
+            answer = get_chatbot_response(prompt)
+            if answer not in AI_ERROR_MESSAGES:
+                with self._lock:
+                    self._quick_answers[prompt] = (answer, time.time())
+        finally:
+            with self._lock:
+                self._pending_prompts.discard(prompt)
+
+@st.cache_resource
+def get_prefetcher():
+    """Get the prefetcher shared by all sessions."""
+    return Prefetcher(PREFETCH_MAX_CALLS_PER_HOUR, QUICK_ACTION_REFRESH_SECONDS)
+
+def prefetch_recommendations(analysis_result, image_hash):
+    """
+    Start generating default recommendations in the background the first time
+    an image is analyzed, so the Recommendations tab can answer instantly.
+    Keyed on the image content hash, so reruns on the same upload don't resubmit.
+    """
+    if not ENABLE_PREFETCH or analysis_result.get("food_name") in ["Not Food", "Unknown"]:
+        return
+    
+    prefetched = st.session_state.get("prefetched_recommendations")
+    if prefetched and prefetched[0] == image_hash:
+        return
+    
+    if prefetched and prefetched[1] is not None:
+        prefetched[1].cancel()
+    future = get_prefetcher().submit(get_food_recommendations, analysis_result, "")
+    st.session_state.prefetched_recommendations = (image_hash, future)
+
+def get_prefetched_recommendations(image_hash):
+    """
+    Return prefetched default recommendations for this image if they are ready.
+    Never waits on the shared prefetch pool; returns None if unavailable.
+    """
+    prefetched = st.session_state.get("prefetched_recommendations")
+    if not prefetched or prefetched[0] != image_hash or prefetched[1] is None:
+        return None
+    
+    future = prefetched[1]
+    if future.cancelled():
+        return None
+    if not future.done():
+        future.cancel()
+        return None
+    
+    try:
+        recommendations = future.result()
+    except Exception as e:
+        logger.error(f"Error in prefetched recommendations: {e}")
+        return None
+    return None if recommendations in AI_ERROR_MESSAGES else recommendations
+
+def _stream_completion_text(client, on_update, **request_kwargs):
+    """
+    Stream a chat completion, calling on_update with the fields parsed so far
+    each time a new top-level JSON field completes. Returns the full text.
+    """
+    parser = PartialJSONObjectParser()
+    chunks = []
+    
+    stream = client.chat.completions.create(stream=True, **request_kwargs)
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        chunks.append(delta)
+        if parser.feed(delta):
+            # A rendering error on a partial result must not discard the completion
+            try:
+                on_update(dict(parser.fields))
+            except Exception as e:
+                logger.error(f"Error rendering partial analysis result: {e}")
+    
+    return "".join(chunks).strip()
+
+def analyze_food_image_enhanced(file_obj, on_update=None):
     """
     Enhanced food analysis using advanced LLM with comprehensive nutritional data.
+    If on_update is given, the completion is streamed and on_update is called
+    with the partial result as each top-level field arrives.
     """
     try:
         client = get_openai_client()
@@ -333,7 +585,7 @@ def analyze_food_image_enhanced(file_obj):
         img.save(buffer, format='JPEG', quality=85)
         img_b64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
         
-        response = client.chat.completions.create(
+        request_kwargs = dict(
             model=ANALYSIS_MODEL,
             messages=[
                 {"role": "system", "content": FOOD_ANALYSIS_ENHANCED_PROMPT},
@@ -348,11 +600,15 @@ def analyze_food_image_enhanced(file_obj):
             temperature=OPENAI_TEMPERATURE,
             max_tokens=1000
         )
+        
+        if on_update is None:
+            response = client.chat.completions.create(**request_kwargs)
+            result = response.choices[0].message.content.strip()
+        else:
+            result = _stream_completion_text(client, on_update, **request_kwargs)
     except Exception as e:
         logger.error(f"Error in analyze_food_image_enhanced: {e}")
         return DEFAULT_UNKNOWN_NUTRITION
-
-    result = response.choices[0].message.content.strip()
    
     try:
         if result.startswith('```json') and result.endswith('```'):
@@ -374,7 +630,7 @@ def get_food_recommendations(analysis_result, user_preferences=""):
     try:
         client = get_openai_client()
         if not client:
-            return "I'm sorry, I'm having trouble connecting to the AI service. Please try again later."
+            return AI_CONNECTION_ERROR_MESSAGE
         
         context = f"Food analyzed: {analysis_result.get('food_name', 'Unknown')} with {analysis_result.get('calories', 0)} calories. "
         context += f"Nutritional facts: {analysis_result.get('nutritional_facts', {})}. "
@@ -397,7 +653,72 @@ def get_food_recommendations(analysis_result, user_preferences=""):
         
     except Exception as e:
         logger.error(f"Error in get_food_recommendations: {e}")
-        return "I'm sorry, I encountered an error while generating recommendations. Please try again."
+        return RECOMMENDATION_ERROR_MESSAGE
+
+def render_analysis_summary(result):
+    """
+    Render the headline metrics of an analysis result.
+    Works with partial results while the analysis is still streaming.
+    """
+    col1a, col1b = st.columns(2)
+    with col1a:
+        st.metric("Food Name", result.get("food_name", "…"))
+        st.metric("Serving Size", result.get("serving_size", "N/A"))
+    with col1b:
+        calories = result.get("calories")
+        st.metric("Calories", f"{calories} kcal" if calories is not None else "…")
+        health_score = result.get("health_score", 0)
+        if health_score > 0:
+            st.metric("Health Score", f"{health_score}/10", delta=f"{health_score-5}" if health_score != 5 else None)
+
+def render_nutrition_details(result):
+    """
+    Render the nutritional facts and extra sections of an analysis result.
+    Works with partial results while the analysis is still streaming.
+    """
+    if result.get("food_name") in ["Not Food", "Unknown"]:
+        st.warning("No nutritional information available for non-food items.")
+        return
+    
+    nutrition = result.get("nutritional_facts")
+    if nutrition:
+        st.markdown("### Macronutrients")
+        col2a, col2b = st.columns(2)
+        
+        with col2a:
+            st.metric("Protein", nutrition.get("protein", "N/A"))
+            st.metric("Carbohydrates", nutrition.get("carbohydrates", "N/A"))
+            st.metric("Sugar", nutrition.get("sugar", "N/A"))
+        
+        with col2b:
+            st.metric("Total Fat", nutrition.get("total_fat", "N/A"))
+            st.metric("Saturated Fat", nutrition.get("saturated_fat", "N/A"))
+            st.metric("Fiber", nutrition.get("fiber", "N/A"))
+        
+        st.metric("Sodium", nutrition.get("sodium", "N/A"))
+        st.metric("Cholesterol", nutrition.get("cholesterol", "N/A"))
+    
+    if result.get("health_benefits"):
+        st.markdown("### 🌟 Health Benefits")
+        for benefit in result["health_benefits"]:
+            st.write(f"• {benefit}")
+    
+    if result.get("dietary_tags"):
+        st.markdown("### 🏷️ Dietary Tags")
+        tags = " ".join([f"`{tag}`" for tag in result["dietary_tags"]])
+        st.markdown(tags)
+    
+    if result.get("cooking_suggestions"):
+        st.markdown("### 👨‍🍳 Cooking Tip")
+        st.info(f"💡 {result['cooking_suggestions']}")
+    
+    if result.get("allergen_warnings"):
+        st.markdown("### ⚠️ Allergen Warnings")
+        for allergen in result["allergen_warnings"]:
+            st.warning(f"⚠️ Contains: {allergen}")
+    
+    st.markdown("### ℹ️ Additional Information")
+    st.info("💡 This enhanced analysis is powered by advanced AI and should be used as a general guide. For precise nutritional information, consult a nutritionist or food database.")
 
 def render_enhanced_food_analysis_interface():
     """
@@ -420,6 +741,14 @@ def render_enhanced_food_analysis_interface():
             st.success(f"✅ API key found: {api_key[:10]}...{api_key[-4:]}")
         else:
             st.error("❌ API key not found or not configured")
+        
+        if ENABLE_SEMANTIC_CACHE:
+            stats = get_semantic_cache().stats()
+            st.write(
+                f"**Chat answer cache:** {stats['entries']} entries, "
+                f"{stats['hit_rate']:.0%} hit rate over {stats['lookups']} lookups, "
+                f"{stats['avg_lookup_ms']:.2f} ms average lookup"
+            )
     
     with st.sidebar:
         st.header("📸 Upload Image")
@@ -430,95 +759,58 @@ def render_enhanced_food_analysis_interface():
         )
         
         if uploaded_file is not None:
-            image = Image.open(uploaded_file)
-            st.image(image, caption="Uploaded Image", use_container_width=True)
+            image_hash = get_image_hash(uploaded_file.getvalue())
+            thumbnail = get_image_thumbnail(uploaded_file.getvalue(), image_hash)
+            st.image(thumbnail, caption="Uploaded Image", use_container_width=True)
     
     col1, col2 = st.columns([1, 1])
     
     with col1:
         st.header("🧠 Smart Analysis Results")
+        summary_placeholder = st.empty()
+    
+    with col2:
+        st.header("📊 Enhanced Nutritional Facts")
+        details_placeholder = st.empty()
+    
+    if uploaded_file is not None:
+        def show_partial_result(partial):
+            with summary_placeholder.container():
+                render_analysis_summary(partial)
+            with details_placeholder.container():
+                render_nutrition_details(partial)
         
-        if uploaded_file is not None:
+        with col1:
             with st.spinner("🤖 AI is analyzing your food image..."):
                 try:
                     uploaded_file.seek(0)
-                    result = analyze_food_image_enhanced(uploaded_file)
+                    on_update = show_partial_result if ENABLE_STREAMING_ANALYSIS else None
+                    result = analyze_food_image_enhanced(uploaded_file, on_update=on_update)
                     
                     st.session_state.enhanced_analysis_result = result
+                    st.session_state.analysis_image_hash = image_hash
+                    prefetch_recommendations(result, image_hash)
                     
-                    if result["food_name"] == "Not Food":
-                        st.warning("⚠️ The uploaded image doesn't appear to contain food.")
-                    elif result["food_name"] == "Unknown":
-                        st.error("❌ Unable to analyze the image. Please try a clearer image.")
-                    else:
-                        st.success(f"✅ Successfully analyzed: **{result['food_name']}**")
-
-                    col1a, col1b = st.columns(2)
-                    with col1a:
-                        st.metric("Food Name", result["food_name"])
-                        st.metric("Serving Size", result.get("serving_size", "N/A"))
-                    with col1b:
-                        st.metric("Calories", f"{result['calories']} kcal")
-                        health_score = result.get("health_score", 0)
-                        if health_score > 0:
-                            st.metric("Health Score", f"{health_score}/10", delta=f"{health_score-5}" if health_score != 5 else None)
+                    with summary_placeholder.container():
+                        if result["food_name"] == "Not Food":
+                            st.warning("⚠️ The uploaded image doesn't appear to contain food.")
+                        elif result["food_name"] == "Unknown":
+                            st.error("❌ Unable to analyze the image. Please try a clearer image.")
+                        else:
+                            st.success(f"✅ Successfully analyzed: **{result['food_name']}**")
+                        
+                        render_analysis_summary(result)
                     
                 except Exception as e:
-                    st.error(f"❌ Error analyzing image: {str(e)}")
+                    summary_placeholder.error(f"❌ Error analyzing image: {str(e)}")
                     logger.error(f"Error in analyze_food_image_enhanced: {e}")
                     st.session_state.enhanced_analysis_result = DEFAULT_UNKNOWN_NUTRITION
-        else:
-            st.info("👆 Please upload an image to get started!")
-    
-    with col2:
-        st.header("📊 Enhanced Nutritional Facts")
         
-        if uploaded_file is not None and hasattr(st.session_state, 'enhanced_analysis_result'):
-            result = st.session_state.enhanced_analysis_result
-            if result["food_name"] not in ["Not Food", "Unknown"]:
-                nutrition = result["nutritional_facts"]
-                
-                st.markdown("### Macronutrients")
-                col2a, col2b = st.columns(2)
-                
-                with col2a:
-                    st.metric("Protein", nutrition.get("protein", "N/A"))
-                    st.metric("Carbohydrates", nutrition.get("carbohydrates", "N/A"))
-                    st.metric("Sugar", nutrition.get("sugar", "N/A"))
-                
-                with col2b:
-                    st.metric("Total Fat", nutrition.get("total_fat", "N/A"))
-                    st.metric("Saturated Fat", nutrition.get("saturated_fat", "N/A"))
-                    st.metric("Fiber", nutrition.get("fiber", "N/A"))
-                
-                st.metric("Sodium", nutrition.get("sodium", "N/A"))
-                st.metric("Cholesterol", nutrition.get("cholesterol", "N/A"))
-                
-                if result.get("health_benefits"):
-                    st.markdown("### 🌟 Health Benefits")
-                    for benefit in result["health_benefits"]:
-                        st.write(f"• {benefit}")
-                
-                if result.get("dietary_tags"):
-                    st.markdown("### 🏷️ Dietary Tags")
-                    tags = " ".join([f"`{tag}`" for tag in result["dietary_tags"]])
-                    st.markdown(tags)
-                
-                if result.get("cooking_suggestions"):
-                    st.markdown("### 👨‍🍳 Cooking Tip")
-                    st.info(f"💡 {result['cooking_suggestions']}")
-                
-                if result.get("allergen_warnings"):
-                    st.markdown("### ⚠️ Allergen Warnings")
-                    for allergen in result["allergen_warnings"]:
-                        st.warning(f"⚠️ Contains: {allergen}")
-                
-                st.markdown("### ℹ️ Additional Information")
-                st.info("💡 This enhanced analysis is powered by advanced AI and should be used as a general guide. For precise nutritional information, consult a nutritionist or food database.")
-            else:
-                st.warning("No nutritional information available for non-food items.")
-        else:
-            st.info("Upload an image to see enhanced nutritional facts here!")
+        with details_placeholder.container():
+            render_nutrition_details(st.session_state.enhanced_analysis_result)
+    else:
+        summary_placeholder.info("👆 Please upload an image to get started!")
+        details_placeholder.info("Upload an image to see enhanced nutritional facts here!")
     
     st.markdown("---")
     st.markdown(
@@ -547,7 +839,11 @@ def render_recommendations_interface():
             
             if st.button("🤖 Get AI Recommendations", type="primary"):
                 with st.spinner("🧠 AI is generating personalized recommendations..."):
-                    recommendations = get_food_recommendations(result, user_preferences)
+                    recommendations = None
+                    if not user_preferences.strip():
+                        recommendations = get_prefetched_recommendations(st.session_state.get("analysis_image_hash"))
+                    if recommendations is None:
+                        recommendations = get_food_recommendations(result, user_preferences)
                     st.markdown("### 🎯 Your Personalized Recommendations")
                     st.write(recommendations)
         else:
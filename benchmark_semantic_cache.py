@@ -0,0 +1,92 @@
+"""
+Benchmark for the chatbot semantic answer cache.
+
+Fills a SemanticAnswerCache with synthetic nutrition-style questions and
+reports lookup latency and LSH candidate counts. All entries share one food
+context by default, the worst case for lookups since context partitioning
+doesn't help.
+
+Usage:
+    python benchmark_semantic_cache.py --entries 100000
+    python benchmark_semantic_cache.py --entries 100000 --contexts 50
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from semantic_cache import SemanticAnswerCache
+
+TEMPLATES = [
+    "how much {nutrient} is in {food}",
+    "is {food} good for {goal}",
+    "how much {nutrient} should i eat per day for {goal}",
+    "what are the best {nutrient} sources for {goal}",
+    "can i eat {food} on a {diet} diet",
+    "what should i eat with {food} for {meal}",
+    "is {food} high in {nutrient}",
+    "how many calories are in {food} for {meal}",
+    "what is a healthy {meal} with {food} and {food2}",
+    "does {food} have more {nutrient} than {food2}",
+]
+
+FOODS = [
+    "chicken breast", "brown rice", "white rice", "quinoa", "salmon", "tuna", "eggs", "greek yogurt",
+    "oatmeal", "banana", "apple", "avocado", "spinach", "broccoli", "sweet potato", "lentils",
+    "chickpeas", "tofu", "almonds", "peanut butter", "whole wheat bread", "pasta", "pizza", "cheese",
+    "milk", "beef", "pork", "turkey", "shrimp", "blueberries", "strawberries", "orange", "kale",
+    "cottage cheese", "black beans", "cashews", "dark chocolate", "granola", "bagel", "hummus",
+]
+NUTRIENTS = ["protein", "fiber", "sugar", "sodium", "fat", "saturated fat", "carbs", "iron", "calcium",
+             "vitamin c", "vitamin d", "potassium", "magnesium", "omega 3", "cholesterol", "calories"]
+GOALS = ["weight loss", "muscle gain", "diabetes", "heart health", "energy", "pregnancy", "running",
+         "gut health", "better sleep", "lower blood pressure"]
+DIETS = ["keto", "vegan", "vegetarian", "paleo", "low carb", "mediterranean", "gluten free", "low fodmap"]
+MEALS = ["breakfast", "lunch", "dinner", "a snack", "pre workout", "post workout"]
+
+
+def make_question(rng):
+    food, food2 = rng.sample(FOODS, 2)
+    return rng.choice(TEMPLATES).format(
+        food=food, food2=food2, nutrient=rng.choice(NUTRIENTS), goal=rng.choice(GOALS),
+        diet=rng.choice(DIETS), meal=rng.choice(MEALS)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark semantic answer cache lookups.")
+    parser.add_argument("--entries", type=int, default=100_000, help="Cached questions to load")
+    parser.add_argument("--lookups", type=int, default=2000, help="Lookups to time")
+    parser.add_argument("--contexts", type=int, default=1, help="Distinct food contexts to spread entries over")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    contexts = [""] + [f"food {i}" for i in range(1, args.contexts)]
+    cache = SemanticAnswerCache(max_entries=args.entries)
+
+    start = time.perf_counter()
+    for i in range(args.entries):
+        cache.add(make_question(rng), rng.choice(contexts), f"answer {i}")
+    print(f"Loaded {args.entries} entries over {args.contexts} context(s) in {time.perf_counter() - start:.1f}s")
+
+    # Templates repeat often, so lookups mix exact repeats (hits) and unseen questions
+    queries = [make_question(rng) for _ in range(args.lookups)]
+    timings = []
+    for question in queries:
+        context = rng.choice(contexts)
+        start = time.perf_counter()
+        cache.get(question, context)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    stats = cache.stats()
+    print(f"get(): mean {statistics.mean(timings):.3f} ms, p50 {timings[len(timings) // 2]:.3f} ms, "
+          f"p99 {timings[int(len(timings) * 0.99)]:.3f} ms")
+    print(f"Rows scored per lookup: {stats['avg_candidates']:.0f}")
+    print(f"Hit rate: {stats['hit_rate']:.1%} over {stats['lookups']} lookups")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,12 @@ OPENAI_TEMPERATURE = 0.2
 SUPPORTED_IMAGE_FORMATS = ['png', 'jpg', 'jpeg']
 
 
+THUMBNAIL_MAX_SIZE = (512, 512)
+THUMBNAIL_FORMAT = "WEBP"
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_CACHE_MAX_ENTRIES = 100
+
+
 APP_TITLE = "AI Food Intelligence Hub"
 APP_ICON = "🧠"
 APP_LAYOUT = "wide"
@@ -60,6 +66,28 @@ CHATBOT_MAX_TOKENS = 1000
 CHATBOT_TEMPERATURE = 0.7
 
 
+AI_CONNECTION_ERROR_MESSAGE = "I'm sorry, I'm having trouble connecting to the AI service. Please try again later."
+CHATBOT_ERROR_MESSAGE = "I'm sorry, I encountered an error while processing your message. Please try again."
+RECOMMENDATION_ERROR_MESSAGE = "I'm sorry, I encountered an error while generating recommendations. Please try again."
+
+
+# Local semantic cache for chatbot answers (opt-in, no network embedding service).
+# Matching is lexical: at 0.85 only near-verbatim rewordings hit (e.g. "how much protein
+# should I eat per day" / "how much protein do I need to eat per day" scores ~0.86).
+ENABLE_SEMANTIC_CACHE = False
+SEMANTIC_CACHE_THRESHOLD = 0.85
+SEMANTIC_CACHE_MAX_ENTRIES = 100_000
+SEMANTIC_CACHE_DIMENSIONS = 256
+
+
+QUICK_ACTION_PROMPTS = {
+    "fruits": "Tell me about the health benefits of different fruits and which ones I should include in my diet.",
+    "protein": "What are the best protein sources for a healthy diet and how much protein should I eat daily?",
+    "meal_planning": "Help me create a balanced meal plan for the week with healthy breakfast, lunch, and dinner options.",
+    "tips": "Give me 5 practical nutrition tips for improving my daily diet and overall health."
+}
+
+
 FOOD_RECOMMENDATION_SYSTEM_PROMPT = """You are an advanced AI nutritionist and food recommendation expert. You can:
 
 1. Analyze food images and provide detailed nutritional insights
@@ -98,5 +126,14 @@ If the image is not food, return the same structure with appropriate "Not Food"
 
 
 ANALYSIS_MODEL = "gpt-4o" 
+ENABLE_STREAMING_ANALYSIS = True
+
+
+# Speculative prefetching of recommendations and quick-action answers (opt-in)
+ENABLE_PREFETCH = False
+PREFETCH_MAX_CALLS_PER_HOUR = 60
+PREFETCH_MAX_WORKERS = 4
+QUICK_ACTION_REFRESH_SECONDS = 6 * 60 * 60
+
 CHAT_MODEL = "gpt-4o-mini" 
 RECOMMENDATION_MODEL = "gpt-4o" 
\ No newline at end of file
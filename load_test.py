@@ -0,0 +1,601 @@
+"""
+Multi-session load test harness for the Food Nutrition Analyzer app.
+
+Drives many simulated Streamlit sessions through streamlit.testing's AppTest
+(upload an image, chat, request recommendations) against a local fake OpenAI
+server with realistic latency, then reports per-interaction latency
+percentiles, upstream API calls per user action and server memory.
+
+By default (--mode shared) every session lives in this one process, as on a
+real Streamlit server: N AppTest instances are kept alive and their
+interactions are interleaved round-robin, so st.cache_resource / st.cache_data
+state (prefetcher, chat answer cache, thumbnails) is shared and process RSS is
+reported as sessions accumulate. AppTest swaps process-wide state (st.secrets,
+the Streamlit runtime) on every run, so runs are never overlapped; latencies
+therefore show per-rerun cost with N live sessions, not request queueing.
+
+--mode process runs each session start to finish in its own spawned worker,
+--concurrency at a time, to isolate per-session cost.
+
+Upstream calls are counted by the fake server per API key. Calls made outside
+any session's run (background prefetch threads) use a separate key and are
+reported on their own.
+
+Usage:
+    python load_test.py --users 50
+    python load_test.py --users 500 --output report.json
+    python load_test.py --users 50 --mode process --concurrency 10
+    python load_test.py --users 50 --baseline report.json --tolerance 0.2
+
+The process exits with status 1 if any configured threshold or baseline
+comparison fails, so it can be used as a regression gate.
+"""
+
+import argparse
+import functools
+import io
+import json
+import math
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+from config import FOOD_ANALYSIS_ENHANCED_PROMPT, FOOD_RECOMMENDATION_SYSTEM_PROMPT
+
+
+# Median latency (seconds) and log-normal sigma of each fake endpoint
+FAKE_LATENCY = {
+    "analysis": (2.5, 0.35),
+    "recommendation": (2.0, 0.30),
+    "chat": (1.2, 0.40),
+}
+
+FAKE_ANALYSIS_RESULT = {
+    "food_name": "Grilled Chicken Salad",
+    "calories": 350,
+    "serving_size": "1 bowl (300g)",
+    "nutritional_facts": {
+        "protein": "32g",
+        "carbohydrates": "12g",
+        "total_fat": "18g",
+        "fiber": "5g",
+        "sodium": "480mg",
+        "sugar": "6g",
+        "saturated_fat": "4g",
+        "cholesterol": "85mg"
+    },
+    "health_benefits": ["High in lean protein", "Rich in vitamins A and C", "Good source of fiber"],
+    "dietary_tags": ["high-protein", "gluten-free", "low-carb"],
+    "cooking_suggestions": "Use olive oil and lemon instead of creamy dressings.",
+    "health_score": 8,
+    "allergen_warnings": []
+}
+
+CHAT_QUESTIONS = [
+    "How much protein should I eat per day?",
+    "Is this meal good for weight loss?",
+    "What can I add to make this meal more filling?",
+    "Which vegetables are highest in fiber?",
+]
+
+RECOMMENDATIONS_BUTTON = "🤖 Get AI Recommendations"
+BACKGROUND_API_KEY = "load-test-background"
+
+# Runs inside each AppTest session. AppTest can't drive st.file_uploader, so the
+# uploader is swapped for one that returns the bytes the harness put in session state.
+DRIVER_SCRIPT = """
+import io
+import streamlit as st
+import app
+
+class _LoadTestUpload(io.BytesIO):
+    name = "load_test.jpg"
+    type = "image/jpeg"
+
+def _file_uploader(label, *args, **kwargs):
+    data = st.session_state.get("load_test_upload")
+    return _LoadTestUpload(data) if data is not None else None
+
+st.file_uploader = _file_uploader
+app.main()
+"""
+
+
+class FakeOpenAIServer:
+    """
+    Minimal local stand-in for the OpenAI chat completions endpoint.
+    Upstream calls are counted per API key, so each session uses its own key.
+    """
+
+    def __init__(self, latency_scale=1.0, seed=None):
+        self.latency_scale = latency_scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def control_url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}/_load_test/calls"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def calls_for(self, api_key):
+        with self._lock:
+            return self._calls.get(api_key, 0)
+
+    def total_calls(self):
+        with self._lock:
+            return sum(self._calls.values())
+
+    def _record_call(self, api_key):
+        with self._lock:
+            self._calls[api_key] = self._calls.get(api_key, 0) + 1
+
+    def _sample_latency(self, kind):
+        median, sigma = FAKE_LATENCY[kind]
+        with self._lock:
+            sample = self._random.lognormvariate(0, sigma)
+        return median * sample * self.latency_scale
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                url = urllib.parse.urlparse(self.path)
+                if url.path != "/_load_test/calls":
+                    self.send_error(404)
+                    return
+                api_key = urllib.parse.parse_qs(url.query).get("key", [""])[0]
+                self._send_json({"calls": server.calls_for(api_key)})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                api_key = self.headers.get("Authorization", "").replace("Bearer ", "", 1)
+                server._record_call(api_key)
+
+                kind = _classify_request(body)
+                content = _fake_completion_content(kind)
+                latency = server._sample_latency(kind)
+
+                if body.get("stream"):
+                    self._send_stream(body, content, latency)
+                else:
+                    time.sleep(latency)
+                    self._send_json(_completion_payload(body, content))
+
+            def _send_json(self, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, body, content, latency):
+                self.close_connection = True
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                # Roughly 10% of the latency before the first token, the rest spread over chunks
+                pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+                time.sleep(latency * 0.1)
+                for piece in pieces:
+                    time.sleep(latency * 0.9 / len(pieces))
+                    chunk = _chunk_payload(body, {"content": piece}, None)
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                chunk = _chunk_payload(body, {}, "stop")
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+        return Handler
+
+
+def _classify_request(body):
+    messages = body.get("messages", [])
+    for message in messages:
+        if isinstance(message.get("content"), list):
+            return "analysis"
+    if messages and messages[0].get("content") == FOOD_RECOMMENDATION_SYSTEM_PROMPT:
+        return "recommendation"
+    if messages and messages[0].get("content") == FOOD_ANALYSIS_ENHANCED_PROMPT:
+        return "analysis"
+    return "chat"
+
+
+def _fake_completion_content(kind):
+    if kind == "analysis":
+        return json.dumps(FAKE_ANALYSIS_RESULT, indent=2)
+    if kind == "recommendation":
+        return "1. Swap creamy dressings for vinaigrette.\n2. Add quinoa for complex carbs.\n3. Include more leafy greens."
+    return "A balanced diet includes lean proteins, whole grains, fruits and vegetables. Aim for variety at every meal."
+
+
+def _completion_payload(body, content):
+    return {
+        "id": "chatcmpl-loadtest",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    }
+
+
+def _chunk_payload(body, delta, finish_reason):
+    return {
+        "id": "chatcmpl-loadtest",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+
+
+def make_test_image(width=1600, height=1200):
+    """Create an in-memory JPEG roughly the size of a phone photo upload."""
+    img = Image.effect_noise((width, height), 64).convert("RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def fetch_call_count(control_url, api_key):
+    """Ask the fake server how many upstream calls this API key has made."""
+    query = urllib.parse.urlencode({"key": api_key})
+    with urllib.request.urlopen(f"{control_url}?{query}") as response:
+        return json.load(response)["calls"]
+
+
+def current_rss_mb():
+    """Current resident set size of this process in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class SimulatedSession:
+    """
+    One simulated user with its own AppTest: load the page, upload an image,
+    chat, then request recommendations. run_next_step() performs a single
+    interaction and records (action, latency_seconds, upstream_calls, error).
+    """
+
+    def __init__(self, session_id, control_url, image_bytes, args):
+        from streamlit.testing.v1 import AppTest
+
+        self.api_key = f"load-test-{session_id}"
+        self.samples = []
+        self._control_url = control_url
+        self._image_bytes = image_bytes
+        self.at = AppTest.from_string(DRIVER_SCRIPT, default_timeout=args.timeout)
+        self.at.secrets["OPENAI_API_KEY"] = self.api_key
+
+        questions = random.Random(session_id).sample(CHAT_QUESTIONS, min(args.chat_messages, len(CHAT_QUESTIONS)))
+        self._steps = deque(
+            [("page_load", self.at.run), ("upload_image", self._upload)]
+            + [("chat", functools.partial(self._chat, question)) for question in questions]
+            + [("recommendations", self._recommend)]
+        )
+
+    @property
+    def done(self):
+        return not self._steps
+
+    def run_next_step(self):
+        action, step = self._steps.popleft()
+        calls_before = fetch_call_count(self._control_url, self.api_key)
+        start = time.perf_counter()
+        error = None
+        try:
+            step()
+            if self.at.exception:
+                error = self.at.exception[0].message
+        except Exception as e:
+            error = str(e)
+        elapsed = time.perf_counter() - start
+        calls = fetch_call_count(self._control_url, self.api_key) - calls_before
+        self.samples.append((action, elapsed, calls, error))
+
+    def _upload(self):
+        self.at.session_state["load_test_upload"] = self._image_bytes
+        self.at.run()
+
+    def _chat(self, question):
+        self.at.chat_input[0].set_value(question).run()
+
+    def _recommend(self):
+        buttons = [b for b in self.at.button if b.label == RECOMMENDATIONS_BUTTON]
+        if not buttons:
+            raise RuntimeError("Recommendations button not rendered")
+        buttons[0].click().run()
+
+
+def run_shared_sessions(server, image_bytes, args):
+    """
+    Keep every simulated session alive in this one process, as a real Streamlit
+    server would, and interleave their interactions round-robin. AppTest.run()
+    blocks, so only one session runs at a time and the per-run st.secrets swap
+    can't race. Returns the samples and the memory report.
+    """
+    sessions = []
+    rss_by_sessions = [{"sessions": 0, "rss_mb": round(current_rss_mb(), 1)}]
+    sample_every = max(1, args.users // 20)
+
+    # Ramp up: each new session loads the page and then stays alive
+    for i in range(args.users):
+        session = SimulatedSession(i, server.control_url, image_bytes, args)
+        session.run_next_step()
+        sessions.append(session)
+        if (i + 1) % sample_every == 0 or i + 1 == args.users:
+            rss_by_sessions.append({"sessions": i + 1, "rss_mb": round(current_rss_mb(), 1)})
+
+    while not all(session.done for session in sessions):
+        for session in sessions:
+            if not session.done:
+                session.run_next_step()
+
+    rss_after = current_rss_mb()
+    memory = {
+        "mode": "shared",
+        # Current RSS of this process as live sessions accumulate
+        "rss_mb_by_sessions": rss_by_sessions,
+        "rss_after_interactions_mb": round(rss_after, 1),
+        "peak_rss_mb": round(max(peak_rss_mb(), rss_after), 1),
+        "rss_growth_per_session_mb": round((rss_after - rss_by_sessions[0]["rss_mb"]) / max(args.users, 1), 2)
+    }
+    return [sample for session in sessions for sample in session.samples], memory
+
+
+def run_isolated_session(session_id, base_url, control_url, image_bytes, args):
+    """
+    Run one simulated session start to finish in a dedicated worker process.
+    Returns its samples and the worker's peak RSS.
+    """
+    os.environ["OPENAI_BASE_URL"] = base_url
+    session = SimulatedSession(session_id, control_url, image_bytes, args)
+    while not session.done:
+        session.run_next_step()
+    return session.samples, peak_rss_mb()
+
+
+def run_process_sessions(server, image_bytes, args):
+    """
+    Run each session in its own spawned process (--mode process). Sessions
+    share no Streamlit state, so this isolates per-session cost only.
+    """
+    samples = []
+    session_rss = []
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=args.concurrency, maxtasksperchild=1) as pool:
+        tasks = [(i, server.base_url, server.control_url, image_bytes, args) for i in range(args.users)]
+        for session_samples, rss in pool.starmap(run_isolated_session, tasks, chunksize=1):
+            samples.extend(session_samples)
+            session_rss.append(rss)
+
+    memory = {
+        "mode": "process",
+        # Peak RSS of each worker process hosting one session (interpreter, app and AppTest)
+        "session_process_peak_rss_mb": {
+            "p50": round(percentile(session_rss, 50), 1),
+            "max": round(max(session_rss, default=0.0), 1)
+        }
+    }
+    return samples, memory
+
+
+def build_report(samples, memory, server, args, duration):
+    """Aggregate raw samples into the report dictionary."""
+    actions = {}
+    for action, elapsed, calls, error in samples:
+        stats = actions.setdefault(action, {"latencies": [], "calls": 0, "errors": 0})
+        stats["latencies"].append(elapsed * 1000)
+        stats["calls"] += calls
+        stats["errors"] += 1 if error else 0
+
+    report = {
+        "mode": args.mode,
+        "users": args.users,
+        "concurrency": args.concurrency if args.mode == "process" else 1,
+        "latency_scale": args.latency_scale,
+        "duration_s": round(duration, 2),
+        "upstream_calls_total": server.total_calls(),
+        # Calls made outside any session's run (e.g. prefetch threads) can't be attributed to an action
+        "background_upstream_calls": server.calls_for(BACKGROUND_API_KEY),
+        "errors": sum(stats["errors"] for stats in actions.values()),
+        "actions": {},
+        "memory": memory
+    }
+    for action, stats in actions.items():
+        latencies = stats["latencies"]
+        report["actions"][action] = {
+            "count": len(latencies),
+            "errors": stats["errors"],
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p90_ms": round(percentile(latencies, 90), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+            "max_ms": round(max(latencies), 1),
+            "upstream_calls_per_action": round(stats["calls"] / len(latencies), 2)
+        }
+    return report
+
+
+def print_report(report):
+    print(f"\nMode: {report['mode']}  Users: {report['users']}  Concurrency: {report['concurrency']}  "
+          f"Duration: {report['duration_s']}s  Upstream calls: {report['upstream_calls_total']} "
+          f"({report['background_upstream_calls']} background)  Errors: {report['errors']}")
+    print(f"{'action':<16}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'calls/action':>14}")
+    for action, stats in report["actions"].items():
+        print(f"{action:<16}{stats['count']:>7}{stats['p50_ms']:>10}{stats['p90_ms']:>10}"
+              f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['upstream_calls_per_action']:>14}")
+    memory = report["memory"]
+    if memory["mode"] == "shared":
+        ramp = ", ".join(f"{point['sessions']}: {point['rss_mb']} MB" for point in memory["rss_mb_by_sessions"])
+        print(f"Process RSS by live sessions: {ramp}")
+        print(f"RSS after all interactions: {memory['rss_after_interactions_mb']} MB "
+              f"({memory['rss_growth_per_session_mb']} MB/session), peak {memory['peak_rss_mb']} MB\n")
+    else:
+        rss = memory["session_process_peak_rss_mb"]
+        print(f"Peak RSS per session process: p50 {rss['p50']} MB, max {rss['max']} MB\n")
+
+
+def check_gates(report, args):
+    """Return a list of failure messages for any breached threshold."""
+    failures = []
+    if report["errors"]:
+        failures.append(f"{report['errors']} interactions raised errors")
+
+    for action, stats in report["actions"].items():
+        if args.max_p95_ms is not None and stats["p95_ms"] > args.max_p95_ms:
+            failures.append(f"{action}: p95 {stats['p95_ms']} ms exceeds {args.max_p95_ms} ms")
+        if args.max_calls_per_action is not None and stats["upstream_calls_per_action"] > args.max_calls_per_action:
+            failures.append(f"{action}: {stats['upstream_calls_per_action']} upstream calls per action exceeds {args.max_calls_per_action}")
+
+    memory = report["memory"]
+    peak_rss = memory["peak_rss_mb"] if memory["mode"] == "shared" else memory["session_process_peak_rss_mb"]["max"]
+    if args.max_rss_mb is not None and peak_rss > args.max_rss_mb:
+        failures.append(f"peak RSS {peak_rss} MB exceeds {args.max_rss_mb} MB")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("mode", "process") != report["mode"]:
+            failures.append(f"baseline was recorded with --mode {baseline.get('mode', 'process')}, "
+                            f"this run used --mode {report['mode']}")
+            return failures
+        for action, base in baseline.get("actions", {}).items():
+            stats = report["actions"].get(action)
+            if stats is None:
+                continue
+            if stats["p95_ms"] > base["p95_ms"] * (1 + args.tolerance):
+                failures.append(f"{action}: p95 {stats['p95_ms']} ms regressed from baseline {base['p95_ms']} ms")
+            if stats["upstream_calls_per_action"] > base["upstream_calls_per_action"]:
+                failures.append(f"{action}: upstream calls per action rose from {base['upstream_calls_per_action']} "
+                                f"to {stats['upstream_calls_per_action']}")
+        base_memory = baseline.get("memory", {})
+        if base_memory.get("mode") == "shared" and memory["mode"] == "shared":
+            base_growth = base_memory["rss_growth_per_session_mb"]
+            if base_growth > 0 and memory["rss_growth_per_session_mb"] > base_growth * (1 + args.tolerance):
+                failures.append(f"RSS growth {memory['rss_growth_per_session_mb']} MB/session regressed from "
+                                f"baseline {base_growth} MB/session")
+        elif base_memory.get("mode") == "process" and memory["mode"] == "process":
+            base_p50 = base_memory["session_process_peak_rss_mb"]["p50"]
+            p50 = memory["session_process_peak_rss_mb"]["p50"]
+            if p50 > base_p50 * (1 + args.tolerance):
+                failures.append(f"session process RSS p50 {p50} MB regressed from baseline {base_p50} MB")
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Food Nutrition Analyzer app with simulated sessions.")
+    parser.add_argument("--users", type=int, default=50, help="Number of simulated user sessions")
+    parser.add_argument("--mode", choices=["shared", "process"], default="shared",
+                        help="shared: all sessions live in this process, interleaved round-robin; "
+                             "process: one spawned worker process per session")
+    parser.add_argument("--concurrency", type=int, default=10, help="Worker processes running at the same time (--mode process)")
+    parser.add_argument("--chat-messages", type=int, default=2, help="Chat messages sent per session")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier for fake upstream latency")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-rerun timeout in seconds")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for fake latencies")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression against the baseline")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="Fail if any action's p95 latency exceeds this")
+    parser.add_argument("--max-calls-per-action", type=float, default=None, help="Fail if any action averages more upstream calls")
+    parser.add_argument("--max-rss-mb", type=float, default=None, help="Fail if peak RSS (shared process, or worst session process) exceeds this")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = FakeOpenAIServer(latency_scale=args.latency_scale, seed=args.seed).start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    # Fallback key used when st.secrets isn't populated, i.e. outside any session's run
+    os.environ["OPENAI_API_KEY"] = BACKGROUND_API_KEY
+    image_bytes = make_test_image()
+
+    start = time.perf_counter()
+    try:
+        if args.mode == "shared":
+            samples, memory = run_shared_sessions(server, image_bytes, args)
+        else:
+            samples, memory = run_process_sessions(server, image_bytes, args)
+    finally:
+        server.stop()
+    duration = time.perf_counter() - start
+
+    report = build_report(samples, memory, server, args, duration)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = check_gates(report, args)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
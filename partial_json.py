@@ -0,0 +1,71 @@
+"""
+Incremental parsing of JSON objects streamed from the model, so completed
+fields can be rendered before the whole response has arrived.
+"""
+
+import json
+
+
+class PartialJSONObjectParser:
+    """
+    Incrementally extracts completed top-level fields from a JSON object
+    that arrives in chunks (e.g. a streamed completion).
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self._member = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._done = False
+
+    def feed(self, text):
+        """
+        Consume the next chunk of text. Returns True if any new top-level
+        field was completed by this chunk.
+        """
+        updated = False
+        for char in text:
+            if self._done:
+                break
+            if self._depth == 0:
+                # Skip code fences or any preamble before the object starts
+                if char == '{':
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    updated = self._complete_member() or updated
+                    self._done = True
+                    continue
+            elif char == ',' and self._depth == 1:
+                updated = self._complete_member() or updated
+                continue
+
+            self._member.append(char)
+        return updated
+
+    def _complete_member(self):
+        member = "".join(self._member).strip()
+        self._member = []
+        if not member:
+            return False
+        try:
+            self.fields.update(json.loads("{" + member + "}"))
+        except json.JSONDecodeError:
+            return False
+        return True
@@ -0,0 +1,267 @@
+"""
+Offline semantic answer cache for the AI nutritionist chatbot.
+
+Questions are normalized and embedded locally with a hashing vectorizer
+(word unigrams, bigrams and character trigrams), so no embedding service is
+needed. Embeddings are L2-normalized rows of a NumPy matrix and searched with
+batched cosine similarity.
+
+Entries are partitioned by food context, so a lookup only ever scores rows
+for the same food. Once a partition grows past a few thousand rows, candidate
+rows are pre-selected with random-hyperplane LSH tables. The hyperplanes are
+centered on the partition's mean vector, because questions share so many
+character trigrams that uncentered buckets end up heavily skewed. See
+benchmark_semantic_cache.py for lookup timings at 100k entries.
+
+The vectorizer is lexical, so at the default 0.85 threshold only
+near-verbatim rewordings hit. "how much protein should I eat per day" /
+"how much protein do I need to eat per day" scores about 0.86 and hits, while
+"how much protein per day" / "how much protein do I need per day" scores about
+0.84 and just misses. Paraphrases that share few words miss entirely:
+"how much protein per day" / "daily protein needs" scores about 0.37.
+"""
+
+import re
+import threading
+import time
+import zlib
+from collections import deque
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = {
+    "a", "an", "the", "is", "are", "am", "be", "do", "does", "did", "i", "me", "my",
+    "you", "your", "we", "it", "its", "of", "to", "in", "on", "for", "and", "or",
+    "what", "which", "how", "can", "should", "could", "would", "will", "please",
+    "tell", "about", "this", "that", "there", "with", "much", "many"
+}
+
+
+def normalize_question(text):
+    """Lowercase, strip punctuation and collapse whitespace."""
+    return " ".join(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def _features(normalized):
+    words = [word for word in normalized.split() if word not in STOP_WORDS]
+    features = [(f"w:{word}", 1.0) for word in words]
+    features += [(f"b:{a} {b}", 0.7) for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        features += [(f"c:{padded[i:i + 3]}", 0.4) for i in range(len(padded) - 2)]
+    return features
+
+
+class _ContextPartition:
+    """Rows, answers and LSH buckets for a single food context."""
+
+    def __init__(self, cache):
+        self._cache = cache
+        # Most food contexts only ever see a question or two, so start small and double
+        capacity = 1
+        self.matrix = np.zeros((capacity, cache.dimensions), dtype=np.float32)
+        self.codes = np.zeros((capacity, cache.lsh_tables), dtype=np.int64)
+        self.entry_ids = np.zeros(capacity, dtype=np.int64)
+        self.answers = []
+        self.row_of = {}
+        self.size = 0
+        self.buckets = None
+        self.center = None
+        self._indexed_size = 0
+
+    def add(self, entry_id, vector, answer):
+        if self.size == len(self.matrix):
+            self._grow()
+
+        row = self.size
+        self.matrix[row] = vector
+        self.entry_ids[row] = entry_id
+        self.answers.append(answer)
+        self.row_of[entry_id] = row
+        self.size += 1
+
+        if self.size > self._cache.full_scan_limit and self.size >= 2 * self._indexed_size:
+            # Re-center and rebuild whenever the partition doubles (amortized O(1))
+            self._rebuild_index()
+        elif self.buckets is not None:
+            self.codes[row] = self._cache._codes(vector[None, :] - self.center)[0]
+            for t, code in enumerate(self.codes[row]):
+                self.buckets[t].setdefault(int(code), []).append(row)
+
+    def remove(self, entry_id):
+        """Remove an entry by moving the last row into its slot."""
+        row = self.row_of.pop(entry_id)
+        last = self.size - 1
+
+        if self.buckets is not None:
+            for t, code in enumerate(self.codes[row]):
+                self.buckets[t][int(code)].remove(row)
+            if row != last:
+                for t, code in enumerate(self.codes[last]):
+                    bucket = self.buckets[t][int(code)]
+                    bucket[bucket.index(last)] = row
+
+        if row != last:
+            self.matrix[row] = self.matrix[last]
+            self.codes[row] = self.codes[last]
+            self.entry_ids[row] = self.entry_ids[last]
+            self.answers[row] = self.answers[last]
+            self.row_of[int(self.entry_ids[row])] = row
+        self.answers.pop()
+        self.size -= 1
+
+    def candidates(self, vector):
+        if self.buckets is None:
+            return np.arange(self.size)
+        codes = self._cache._codes(vector[None, :] - self.center)[0]
+        rows = [self.buckets[t].get(int(code), ()) for t, code in enumerate(codes)]
+        return np.unique(np.fromiter((row for bucket in rows for row in bucket), dtype=np.int64))
+
+    def _grow(self):
+        extra = len(self.matrix)
+        self.matrix = np.vstack([self.matrix, np.zeros((extra, self.matrix.shape[1]), dtype=np.float32)])
+        self.codes = np.vstack([self.codes, np.zeros((extra, self.codes.shape[1]), dtype=np.int64)])
+        self.entry_ids = np.concatenate([self.entry_ids, np.zeros(extra, dtype=np.int64)])
+
+    def _rebuild_index(self):
+        vectors = self.matrix[:self.size]
+        self.center = vectors.mean(axis=0)
+        self.codes[:self.size] = self._cache._codes(vectors - self.center)
+        self.buckets = [{} for _ in range(self._cache.lsh_tables)]
+        for row, row_codes in enumerate(self.codes[:self.size].tolist()):
+            for t, code in enumerate(row_codes):
+                self.buckets[t].setdefault(code, []).append(row)
+        self._indexed_size = self.size
+
+
+class SemanticAnswerCache:
+    """
+    Thread-safe cache mapping (question, food context) to a previous answer.
+    Answers are only reused for the same food context, compared after normalization.
+    """
+
+    def __init__(self, dimensions=256, threshold=0.85, max_entries=100_000,
+                 lsh_tables=12, lsh_bits=12, full_scan_limit=4096, seed=0):
+        self.dimensions = dimensions
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.full_scan_limit = full_scan_limit
+        self.lsh_tables = lsh_tables
+
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((dimensions, lsh_tables * lsh_bits)).astype(np.float32)
+        self._bit_weights = (1 << np.arange(lsh_bits)).astype(np.int64)
+
+        self._lock = threading.Lock()
+        self._partitions = {}
+        self._order = deque()  # (context, entry_id), oldest first
+        self._next_entry_id = 0
+
+        self.hits = 0
+        self.misses = 0
+        self._lookup_seconds = 0.0
+        self._candidates_scored = 0
+
+    def vectorize(self, text):
+        """Embed a question as an L2-normalized hashed feature vector."""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        features = _features(normalize_question(text))
+        if not features:
+            return vector
+
+        hashes = np.fromiter((zlib.crc32(name.encode("utf-8")) for name, _ in features),
+                             dtype=np.int64, count=len(features))
+        weights = np.fromiter((weight for _, weight in features), dtype=np.float32, count=len(features))
+        # The top hash bit picks the sign so collisions tend to cancel out
+        signs = np.where(hashes & 0x80000000, 1.0, -1.0).astype(np.float32)
+        np.add.at(vector, hashes % self.dimensions, signs * weights)
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _codes(self, vectors):
+        """LSH bucket codes, one per table, for each row of vectors."""
+        bits = (vectors @ self._planes > 0).reshape(len(vectors), self.lsh_tables, -1)
+        return bits @ self._bit_weights
+
+    def search(self, question, context="", k=1):
+        """
+        Return up to k (similarity, answer) pairs for the most similar cached
+        questions with the same context, best first.
+        """
+        vector = self.vectorize(question)
+        if not vector.any():
+            return []
+
+        with self._lock:
+            partition = self._partitions.get(normalize_question(context or ""))
+            if partition is None:
+                return []
+
+            candidates = partition.candidates(vector)
+            self._candidates_scored += len(candidates)
+            if not len(candidates):
+                return []
+
+            scores = partition.matrix[candidates] @ vector
+            k = min(k, len(scores))
+            top = np.argpartition(scores, -k)[-k:]
+            top = top[np.argsort(scores[top])[::-1]]
+            return [(float(scores[i]), partition.answers[candidates[i]]) for i in top]
+
+    def get(self, question, context=""):
+        """Return a cached answer if a similar enough question was seen, else None."""
+        start = time.perf_counter()
+        matches = self.search(question, context, k=1)
+        answer = matches[0][1] if matches and matches[0][0] >= self.threshold else None
+
+        with self._lock:
+            self._lookup_seconds += time.perf_counter() - start
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return answer
+
+    def add(self, question, context, answer):
+        """Store an answer, evicting the oldest entry once max_entries is reached."""
+        vector = self.vectorize(question)
+        if not vector.any():
+            return
+        # Food names are free text from the model, so "Pizza" and "pizza" share a partition
+        context = normalize_question(context or "")
+
+        with self._lock:
+            if len(self._order) >= self.max_entries:
+                self._evict_oldest()
+
+            partition = self._partitions.get(context)
+            if partition is None:
+                partition = self._partitions[context] = _ContextPartition(self)
+
+            entry_id = self._next_entry_id
+            self._next_entry_id += 1
+            partition.add(entry_id, vector, answer)
+            self._order.append((context, entry_id))
+
+    def _evict_oldest(self):
+        context, entry_id = self._order.popleft()
+        partition = self._partitions[context]
+        partition.remove(entry_id)
+        if not partition.size:
+            del self._partitions[context]
+
+    def stats(self):
+        """Hit-rate and latency metrics for display."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._order),
+                "lookups": lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "avg_lookup_ms": self._lookup_seconds / lookups * 1000 if lookups else 0.0,
+                "avg_candidates": self._candidates_scored / lookups if lookups else 0.0
+            }
@@ -0,0 +1,47 @@
+import json
+
+from partial_json import PartialJSONObjectParser
+
+RESPONSE = {
+    "food_name": "Pizza {Margherita}, large",
+    "description": 'Said to be "the best", with a \\ backslash',
+    "nutrients": {"calories": 850, "macros": [30, 100, 35]},
+    "tips": ["Add a salad, or fruit", "Watch the [cheese]"],
+}
+
+
+def feed_in_chunks(parser, text, size):
+    updates = [parser.feed(text[i:i + size]) for i in range(0, len(text), size)]
+    return any(updates)
+
+
+def test_parses_fenced_json_fed_in_small_chunks():
+    text = "Here you go:\n```json\n" + json.dumps(RESPONSE, indent=2) + "\n```"
+    for size in (1, 3, 7, len(text)):
+        parser = PartialJSONObjectParser()
+        assert feed_in_chunks(parser, text, size)
+        assert parser.fields == RESPONSE
+
+
+def test_escaped_quotes_braces_and_commas_inside_strings_do_not_split_fields():
+    parser = PartialJSONObjectParser()
+    parser.feed('{"a": "x \\"}, \\"b\\": [", "c": "\\\\"')
+
+    assert parser.fields == {"a": 'x "}, "b": ['}
+
+    parser.feed("}")
+    assert parser.fields == {"a": 'x "}, "b": [', "c": "\\"}
+
+
+def test_feed_reports_only_chunks_that_complete_a_field():
+    parser = PartialJSONObjectParser()
+
+    assert not parser.feed('```json\n{"food_name": "Sal')
+    assert parser.feed('ad", "nutrients": {"calories": 120,')
+    assert parser.fields == {"food_name": "Salad"}
+    assert not parser.feed(' "fiber": 4')
+    assert parser.feed('}, "tips": ["a,')
+    assert parser.fields == {"food_name": "Salad", "nutrients": {"calories": 120, "fiber": 4}}
+    assert parser.feed(' b"]}\n```')
+    assert parser.fields["tips"] == ["a, b"]
+    assert not parser.feed('{"ignored": true}')
@@ -0,0 +1,75 @@
+import random
+import string
+
+import numpy as np
+
+from semantic_cache import SemanticAnswerCache
+
+
+def make_questions(count, seed=0):
+    rng = random.Random(seed)
+    words = lambda: " ".join("".join(rng.choices(string.ascii_lowercase, k=7)) for _ in range(4))
+    return [words() for _ in range(count)]
+
+
+def assert_consistent(cache):
+    assert sum(partition.size for partition in cache._partitions.values()) == len(cache._order)
+    for partition in cache._partitions.values():
+        size = partition.size
+        assert len(partition.answers) == size
+        assert partition.row_of == {int(entry_id): row for row, entry_id in enumerate(partition.entry_ids[:size])}
+        if partition.buckets is None:
+            continue
+        expected_codes = cache._codes(partition.matrix[:size] - partition.center)
+        assert np.array_equal(partition.codes[:size], expected_codes)
+        for t, buckets in enumerate(partition.buckets):
+            rows = sorted(row for bucket in buckets.values() for row in bucket)
+            assert rows == list(range(size))
+            for code, bucket in buckets.items():
+                assert all(partition.codes[row, t] == code for row in bucket)
+
+
+def test_exact_repeat_hits_and_unrelated_question_misses():
+    cache = SemanticAnswerCache()
+    cache.add("How much protein should I eat per day?", "", "answer")
+
+    assert cache.get("how much protein should i eat per day") == "answer"
+    assert cache.get("Is pizza bad for my cholesterol?") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_answers_are_scoped_to_normalized_food_context():
+    cache = SemanticAnswerCache()
+    cache.add("is this good for weight loss", "Pizza", "pizza answer")
+
+    assert cache.get("is this good for weight loss", "pizza!") == "pizza answer"
+    assert cache.get("is this good for weight loss", "Salad") is None
+    assert cache.get("is this good for weight loss") is None
+
+
+def test_eviction_keeps_rows_and_lsh_buckets_consistent():
+    cache = SemanticAnswerCache(max_entries=60, full_scan_limit=8)
+    contexts = ["", "Pizza", "Salad"]
+    questions = make_questions(1000)
+
+    for i, question in enumerate(questions):
+        cache.add(question, contexts[i % 3], i)
+        if i % 97 == 0:
+            assert_consistent(cache)
+
+    assert len(cache._order) == 60
+    assert all(partition.buckets is not None for partition in cache._partitions.values())
+    assert_consistent(cache)
+
+
+def test_exact_repeats_still_hit_after_evictions():
+    cache = SemanticAnswerCache(max_entries=60, full_scan_limit=8)
+    contexts = ["", "Pizza", "Salad"]
+    questions = make_questions(1000, seed=1)
+
+    for i, question in enumerate(questions):
+        cache.add(question, contexts[i % 3], i)
+
+    for i in range(len(questions) - 60, len(questions)):
+        assert cache.get(questions[i], contexts[i % 3]) == i
+    assert cache.get(questions[0], contexts[0]) is None